@@ -1,13 +1,31 @@
 """Configuration loader and validation for DaphneTV."""
+import copy
+import json
+import logging
 import os
+import stat
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
 import yaml
 from dotenv import load_dotenv
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Validated configs keyed by path -> (mtime, size, data); see load_config
+_CACHE: OrderedDict[str, tuple[float, int, dict[str, Any]]] = OrderedDict()
+_CACHE_MAX = 100
+_CACHE_LOCK = threading.Lock()
+
 
 def parse_time_range(s: str) -> tuple[str, str]:
     """Parse 'HH:MM-HH:MM' into (start, end) tuples."""
@@ -25,12 +43,63 @@ def time_to_minutes(t: str) -> int:
     return h * 60 + m
 
 
-def load_config(config_path: str | Path | None = None) -> dict[str, Any]:
-    """Load and validate config from YAML file."""
+def _json_cache_path(path: Path) -> Path:
+    """Sidecar holding the parsed YAML document as JSON (config.yaml -> config.cache.json)."""
+    return path.with_suffix(".cache.json")
+
+
+def _read_document(path: Path, st: os.stat_result) -> Any:
+    """Parse the config document, preferring the JSON sidecar over YAML.
+    The sidecar records the (mtime_ns, size) of the YAML it was built from and is
+    only used when both still match exactly. It is written with the YAML's mode and
+    skipped for documents that do not round-trip through JSON unchanged."""
+    json_path = _json_cache_path(path)
+    source = [st.st_mtime_ns, st.st_size]
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            # A sidecar more permissive than the YAML is rewritten, not trusted
+            wider = stat.S_IMODE(os.fstat(f.fileno()).st_mode) & ~stat.S_IMODE(st.st_mode)
+            cached = None if wider else json.load(f)
+        if isinstance(cached, dict) and cached.get("source") == source:
+            return cached["data"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    with open(path, encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+
+    try:
+        encoded = json.dumps({"source": source, "data": data})
+        # JSON stringifies non-string keys (ints, bools); such documents skip the sidecar
+        if json.loads(encoded)["data"] != data:
+            return data
+    except (TypeError, ValueError) as e:
+        logger.debug("Config %s is not JSON-serialisable, not caching: %s", path, e)
+        return data
+
+    tmp_path = json_path.with_name(f"{json_path.name}.{os.getpid()}.tmp")
+    try:
+        # Same permissions as the YAML: the document may hold jellyfin.api_key
+        mode = stat.S_IMODE(st.st_mode)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            os.fchmod(fd, mode)  # O_CREAT's mode does not apply to a leftover tmp file
+            f.write(encoded)
+        os.replace(tmp_path, json_path)
+    except OSError as e:
+        logger.debug("Could not write config cache %s: %s", json_path, e)
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+    return data
+
+
+def resolve_config_path(config_path: str | Path | None = None) -> Path:
+    """Resolve the config file path (CONFIG_PATH, then config/config.yaml for local dev)."""
     if config_path is None:
         config_path = os.getenv("CONFIG_PATH", "/config/config.yaml")
     path = Path(config_path)
-
     if not path.exists():
         # Fallback for local development
         fallback = Path("config/config.yaml")
@@ -38,9 +107,24 @@ def load_config(config_path: str | Path | None = None) -> dict[str, Any]:
             path = fallback
         else:
             raise FileNotFoundError(f"Config file not found: {path}")
+    return path
 
-    with open(path, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+
+def load_config(config_path: str | Path | None = None) -> dict[str, Any]:
+    """Load and validate config from YAML file.
+    Results are cached per path and reused until the file's mtime or size changes;
+    callers always receive a private deep copy. The parsed document is also kept in a
+    JSON sidecar so fresh processes can skip YAML parsing."""
+    path = resolve_config_path(config_path)
+    cache_key = str(path)
+    st = path.stat()
+    with _CACHE_LOCK:
+        entry = _CACHE.get(cache_key)
+        if entry is not None and entry[0] == st.st_mtime and entry[1] == st.st_size:
+            _CACHE.move_to_end(cache_key)
+            return copy.deepcopy(entry[2])
+
+    data = _read_document(path, st)
 
     if not data:
         raise ValueError("Config file is empty")
@@ -70,7 +154,9 @@ def load_config(config_path: str | Path | None = None) -> dict[str, Any]:
                 raise ValueError(
                     f"Schedule block must have 'time' and 'category': {block}"
                 )
-            parse_time_range(block["time"])
+            start, end = parse_time_range(block["time"])
+            # Parsed once here so schedulers don't re-parse the range string
+            block["_range"] = (time_to_minutes(start), time_to_minutes(end))
         ch.setdefault("ad_rotation", {})
         ch["ad_rotation"].setdefault("strategy", "round-robin")
         ch["ad_rotation"].setdefault("ads_per_break", 2)
@@ -78,7 +164,22 @@ def load_config(config_path: str | Path | None = None) -> dict[str, Any]:
     data["ads"].setdefault("formats", [".mp4", ".mkv"])
     data["ads"].setdefault("directory", "/ads")
 
-    return data
+    with _CACHE_LOCK:
+        _CACHE[cache_key] = (st.st_mtime, st.st_size, data)
+        _CACHE.move_to_end(cache_key)
+        while len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+
+    return copy.deepcopy(data)
+
+
+def _cache_clear() -> None:
+    """Drop all cached configs."""
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+load_config.cache_clear = _cache_clear
 
 
 def get_channel_config(config: dict[str, Any], channel_id: str | None = None) -> dict[str, Any]:
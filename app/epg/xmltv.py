@@ -1,20 +1,36 @@
 """XMLTV EPG generation for program guide."""
+import io
+import re
 from datetime import datetime, timedelta
 from typing import Any
 
+_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&apos;",
+})
+_NEEDS_ESCAPE = re.compile(r"[&<>\"']").search
+
 
 def _format_xmltv_time(dt: datetime) -> str:
     """Format datetime for XMLTV: YYYYMMDDHHmmss +0000"""
-    return dt.strftime("%Y%m%d%H%M%S +0000")
+    return (
+        f"{dt.year:04d}{dt.month:02d}{dt.day:02d}"
+        f"{dt.hour:02d}{dt.minute:02d}{dt.second:02d} +0000"
+    )
 
 
-def _parse_time_to_datetime(date_str: str, time_str: str) -> datetime:
-    """Parse date (YYYY-MM-DD) and time (HH:MM:SS) to datetime.
-    Handles 24:00:00 as midnight of the next day."""
-    if time_str in ("24:00:00", "24:00"):
-        dt = datetime.strptime(f"{date_str} 00:00:00", "%Y-%m-%d %H:%M:%S")
-        return dt + timedelta(days=1)
-    return datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
+def _block_datetime(base_date: datetime, time_str: str) -> datetime:
+    """Offset base_date (midnight) by a block time (HH:MM[:SS]).
+    24:00:00 naturally lands on midnight of the next day."""
+    parts = time_str.split(":")
+    return base_date + timedelta(
+        hours=int(parts[0]),
+        minutes=int(parts[1]) if len(parts) > 1 else 0,
+        seconds=int(parts[2]) if len(parts) > 2 else 0,
+    )
 
 
 def generate_xmltv(
@@ -23,25 +39,21 @@ def generate_xmltv(
     channel_name: str,
     fragment: bool = False,
 ) -> str:
-    """Generate XMLTV EPG from schedule. If fragment=True, omit xml decl and tv wrapper."""
+    """Generate XMLTV EPG from schedule. If fragment=True, omit xml decl and tv wrapper.
+    Fragments end with a newline so they can be written back to back."""
     date_str = schedule.get("date", "")
     blocks = schedule.get("blocks", [])
     channel_xml_id = channel_id.replace(" ", "_")
+    display_name = _escape_xml(channel_name)
+    base_date = datetime.strptime(date_str, "%Y-%m-%d")
 
-    if fragment:
-        lines = [
-            f'  <channel id="{channel_xml_id}">',
-            f"    <display-name>{channel_name}</display-name>",
-            "  </channel>",
-        ]
-    else:
-        lines = [
-            '<?xml version="1.0" encoding="UTF-8"?>',
-            "<tv>",
-            f'  <channel id="{channel_xml_id}">',
-            f"    <display-name>{channel_name}</display-name>",
-            "  </channel>",
-        ]
+    buf = io.StringIO()
+    w = buf.write
+    if not fragment:
+        w('<?xml version="1.0" encoding="UTF-8"?>\n<tv>\n')
+    w(f'  <channel id="{channel_xml_id}">\n')
+    w(f"    <display-name>{display_name}</display-name>\n")
+    w("  </channel>\n")
 
     for block in blocks:
         if block.get("type") != "show":
@@ -51,29 +63,23 @@ def generate_xmltv(
         end_time = block.get("end_time", "00:00:00")
         category = block.get("category", "")
 
-        start_dt = _parse_time_to_datetime(date_str, start_time)
-        end_dt = _parse_time_to_datetime(date_str, end_time)
+        start_dt = _block_datetime(base_date, start_time)
+        end_dt = _block_datetime(base_date, end_time)
 
-        lines.append(
+        w(
             f'  <programme start="{_format_xmltv_time(start_dt)}" '
-            f'stop="{_format_xmltv_time(end_dt)}" channel="{channel_xml_id}">'
+            f'stop="{_format_xmltv_time(end_dt)}" channel="{channel_xml_id}">\n'
         )
-        lines.append(f"    <title>{_escape_xml(title)}</title>")
+        w(f"    <title>{_escape_xml(title)}</title>\n")
         if category:
-            lines.append(f"    <category>{_escape_xml(category)}</category>")
-        lines.append("  </programme>")
+            w(f"    <category>{_escape_xml(category)}</category>\n")
+        w("  </programme>\n")
 
     if not fragment:
-        lines.append("</tv>")
-    return "\n".join(lines)
+        w("</tv>")
+    return buf.getvalue()
 
 
 def _escape_xml(s: str) -> str:
-    """Escape XML special characters."""
-    return (
-        s.replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("'", "&apos;")
-    )
+    """Escape XML special characters in a single pass; clean strings are returned as-is."""
+    return s if _NEEDS_ESCAPE(s) is None else s.translate(_ESCAPE_TABLE)
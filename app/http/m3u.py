@@ -1,7 +1,30 @@
 """M3U playlist generation for Jellyfin Live TV."""
+from functools import lru_cache
 from typing import Any
 
 
+@lru_cache(maxsize=256)
+def _channel_entry(ch_id: str, ch_name: str, base_url: str) -> bytes:
+    """Encoded EXTINF + stream URL lines for one channel."""
+    stream_url = f"{base_url.rstrip('/')}/{ch_id}/channel.m3u8"
+    return (
+        f'#EXTINF:-1 tvg-id="{ch_id}" tvg-name="{ch_name}",{ch_name}\n'
+        f"{stream_url}\n"
+    ).encode("utf-8")
+
+
+def generate_m3u_bytes(
+    channels: list[dict[str, Any]],
+    base_url: str = "http://localhost:8001",
+) -> bytes:
+    """Generate the M3U playlist as UTF-8 bytes from cached per-channel entries."""
+    entries = [b"#EXTM3U\n"]
+    for ch in channels:
+        ch_id = ch.get("id", "channel")
+        entries.append(_channel_entry(ch_id, ch.get("name", ch_id), base_url))
+    return b"".join(entries)
+
+
 def generate_m3u(
     channels: list[dict[str, Any]],
     base_url: str = "http://localhost:8001",
@@ -10,13 +33,4 @@ def generate_m3u(
     Generate M3U playlist for Jellyfin Live TV tuner.
     base_url should be the URL where this server is reachable (e.g. http://yourserver:8001)
     """
-    lines = ["#EXTM3U"]
-    for ch in channels:
-        ch_id = ch.get("id", "channel")
-        ch_name = ch.get("name", ch_id)
-        stream_url = f"{base_url.rstrip('/')}/{ch_id}/channel.m3u8"
-        lines.append(
-            f'#EXTINF:-1 tvg-id="{ch_id}" tvg-name="{ch_name}",{ch_name}'
-        )
-        lines.append(stream_url)
-    return "\n".join(lines) + "\n"
+    return generate_m3u_bytes(channels, base_url).decode("utf-8")
@@ -1,8 +1,11 @@
 """HTTP server for HLS streams and M3U."""
+import hashlib
 import io
 import logging
 import os
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import stat
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Callable
 from urllib.parse import unquote, urlparse
@@ -14,10 +17,14 @@ class HLSRequestHandler(SimpleHTTPRequestHandler):
     """Custom handler that serves HLS streams, M3U, and EPG."""
 
     stream_dir = Path(os.getenv("STREAM_DIR", "/stream"))
-    channels_callback: Callable[[], str] | None = None
-    epg_callback: Callable[[], str] | None = None
+    channels_callback: Callable[[], bytes] | None = None
+    epg_callback: Callable[[], bytes] | None = None
     health_callback: Callable[[], bool] | None = None
 
+    INDEX_TTL = 5.0
+    # ((stream dir, mtime_ns), built at (monotonic), html)
+    _index_cache: tuple[tuple[str, int], float, str] | None = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(self.stream_dir), **kwargs)
 
@@ -33,18 +40,43 @@ class HLSRequestHandler(SimpleHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(data)
 
-    def _send_index(self):
-        """Serve index page with links to channels.m3u, epg.xml, streams."""
+    def _not_modified(self, etag: str) -> bool:
+        """True if the client's If-None-Match already covers etag."""
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+        return "*" in tags or etag in tags
+
+    def _send_virtual(self, data: bytes, content_type: str):
+        """Send headers for a generated body with an ETag; 304 if the client has it."""
+        etag = f'"{hashlib.blake2b(data, digest_size=8).hexdigest()}"'
+        if self._not_modified(etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "max-age=30")
+            self.end_headers()
+            return None
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "max-age=30")
+        self.end_headers()
+        return io.BytesIO(data)
+
+    def _render_index(self, stream_path: Path) -> str:
+        """Build the index page HTML, listing channels that have a manifest."""
         streams = []
-        stream_path = Path(os.getenv("STREAM_DIR", "/stream"))
-        if stream_path.exists():
-            for d in stream_path.iterdir():
-                if d.is_dir():
-                    manifest = d / "channel.m3u8"
-                    if manifest.exists():
+        try:
+            with os.scandir(stream_path) as it:
+                for d in it:
+                    if d.is_dir() and os.path.exists(os.path.join(d.path, "channel.m3u8")):
                         streams.append(f'<li><a href="/{d.name}/channel.m3u8">{d.name}</a></li>')
+        except FileNotFoundError:
+            pass
         streams_html = "\n".join(streams) if streams else "<li>No streams</li>"
-        html = f"""<!DOCTYPE html>
+        return f"""<!DOCTYPE html>
 <html><head><title>DaphneTV</title></head><body>
 <h1>DaphneTV</h1>
 <ul>
@@ -55,51 +87,94 @@ class HLSRequestHandler(SimpleHTTPRequestHandler):
 <h2>Streams</h2>
 <ul>{streams_html}</ul>
 </body></html>"""
+
+    def _send_index(self):
+        """Serve index page with links to channels.m3u, epg.xml, streams.
+        The page is rebuilt when the stream dir changes or the cached copy is older
+        than INDEX_TTL (manifests appearing inside a channel dir don't bump its mtime)."""
+        stream_path = Path(os.getenv("STREAM_DIR", "/stream"))
+        try:
+            mtime_ns = stream_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = 0
+        key = (str(stream_path), mtime_ns)
+        now = time.monotonic()
+        cached = HLSRequestHandler._index_cache
+        if cached is not None and cached[0] == key and now - cached[1] < self.INDEX_TTL:
+            html = cached[2]
+        else:
+            html = self._render_index(stream_path)
+            HLSRequestHandler._index_cache = (key, now, html)
         self._send_content(html, "text/html")
 
-    def send_head(self):
-        """Intercept virtual paths before file lookup; parent returns 404 for non-existent files."""
-        path = self._norm_path()
+    def _handle_index(self):
+        self._send_index()
+        return None
 
-        if path == "":
-            self._send_index()
+    def _handle_channels(self):
+        if not self.channels_callback:
+            return super().send_head()
+        try:
+            data = self.channels_callback()
+        except Exception as e:
+            logger.exception("channels_callback failed: %s", e)
+            self.send_error(500)
             return None
-        if path == "channels.m3u" and self.channels_callback:
-            try:
-                content = self.channels_callback()
-                data = content.encode("utf-8")
-            except Exception as e:
-                logger.exception("channels_callback failed: %s", e)
-                self.send_error(500)
-                return None
-            self.send_response(200)
-            self.send_header("Content-Type", "audio/x-mpegurl")
-            self.send_header("Content-Length", str(len(data)))
-            self.end_headers()
-            return io.BytesIO(data)
-        if path == "epg.xml" and self.epg_callback:
-            try:
-                content = self.epg_callback()
-                data = content.encode("utf-8")
-            except Exception as e:
-                logger.exception("epg_callback failed: %s", e)
-                self.send_error(500)
-                return None
-            self.send_response(200)
-            self.send_header("Content-Type", "application/xml")
-            self.send_header("Content-Length", str(len(data)))
-            self.end_headers()
-            return io.BytesIO(data)
-        if path == "health" and self.health_callback:
-            ok = self.health_callback()
-            self.send_response(200 if ok else 503)
-            self.send_header("Content-Type", "text/plain")
-            self.end_headers()
-            self.wfile.write(b"OK" if ok else b"Unhealthy")
+        return self._send_virtual(data, "audio/x-mpegurl")
+
+    def _handle_epg(self):
+        if not self.epg_callback:
+            return super().send_head()
+        try:
+            data = self.epg_callback()
+        except Exception as e:
+            logger.exception("epg_callback failed: %s", e)
+            self.send_error(500)
             return None
+        return self._send_virtual(data, "application/xml")
 
+    def _handle_health(self):
+        if not self.health_callback:
+            return super().send_head()
+        ok = self.health_callback()
+        self.send_response(200 if ok else 503)
+        self.send_header("Content-Type", "text/plain")
+        self.end_headers()
+        self.wfile.write(b"OK" if ok else b"Unhealthy")
+        return None
+
+    _VIRTUAL_PATHS = {
+        "": _handle_index,
+        "channels.m3u": _handle_channels,
+        "epg.xml": _handle_epg,
+        "health": _handle_health,
+    }
+
+    def send_head(self):
+        """Intercept virtual paths before file lookup; parent returns 404 for non-existent files."""
+        # Fast path: exact match on the raw path, skipping urlparse/unquote/lower
+        raw = self.path
+        q = raw.find("?")
+        handler = self._VIRTUAL_PATHS.get((raw[:q] if q >= 0 else raw).strip("/"))
+        if handler is None:
+            handler = self._VIRTUAL_PATHS.get(self._norm_path())
+        if handler is not None:
+            return handler(self)
         return super().send_head()
 
+    def copyfile(self, source, outputfile):
+        """Send regular files (HLS segments, manifests) with sendfile(2) so the bytes
+        stay in the kernel; anything else goes through the buffered parent copy."""
+        try:
+            is_regular = stat.S_ISREG(os.fstat(source.fileno()).st_mode)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            is_regular = False
+        if not is_regular or outputfile is not self.wfile:
+            super().copyfile(source, outputfile)
+            return
+        outputfile.flush()
+        self.connection.sendfile(source)
+
     def log_message(self, format, *args):
         logger.debug("%s - %s", self.address_string(), format % args)
 
@@ -107,16 +182,17 @@ class HLSRequestHandler(SimpleHTTPRequestHandler):
 def run_http_server(
     port: int = 8001,
     stream_dir: str | Path | None = None,
-    channels_callback: Callable[[], str] | None = None,
-    epg_callback: Callable[[], str] | None = None,
+    channels_callback: Callable[[], bytes] | None = None,
+    epg_callback: Callable[[], bytes] | None = None,
     health_callback: Callable[[], bool] | None = None,
-) -> HTTPServer:
-    """Run HTTP server for HLS streams."""
+) -> ThreadingHTTPServer:
+    """Run HTTP server for HLS streams. Each request is handled on its own thread so
+    long segment transfers don't block playlist, EPG, or health requests."""
     HLSRequestHandler.stream_dir = Path(stream_dir or os.getenv("STREAM_DIR", "/stream"))
     HLSRequestHandler.channels_callback = channels_callback
     HLSRequestHandler.epg_callback = epg_callback
     HLSRequestHandler.health_callback = health_callback
 
-    server = HTTPServer(("0.0.0.0", port), HLSRequestHandler)
+    server = ThreadingHTTPServer(("0.0.0.0", port), HLSRequestHandler)
     logger.info("HTTP server listening on port %d", port)
     return server
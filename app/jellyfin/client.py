@@ -1,16 +1,41 @@
 """Jellyfin API client for fetching media library items."""
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to requests' stdlib json decoding
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+def _dedupe_by_id(items: list[dict]) -> list[dict]:
+    """Drop repeated items (same Id), keeping first occurrence order."""
+    seen: set[str] = set()
+    unique: list[dict] = []
+    for item in items:
+        if item["Id"] not in seen:
+            seen.add(item["Id"])
+            unique.append(item)
+    return unique
+
+
 class JellyfinClient:
-    """Client for Jellyfin API."""
+    """Client for Jellyfin API.
+    GET responses are cached in memory for CACHE_TTL seconds so channels sharing
+    categories or items don't repeat requests; call clear_cache() to drop them."""
+
+    CACHE_TTL = 300.0
+    CACHE_MAX = 512
 
     def __init__(self, url: str | None = None, api_key: str | None = None):
         self.url = (url or os.getenv("JELLYFIN_URL", "http://jellyfin:8096")).rstrip("/")
@@ -21,12 +46,38 @@ class JellyfinClient:
             "X-Emby-Token": self.api_key,
             "Accept": "application/json",
         })
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._cache: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def clear_cache(self) -> None:
+        """Drop all cached GET responses."""
+        with self._cache_lock:
+            self._cache.clear()
 
     def _get(self, path: str, params: dict | None = None) -> Any:
-        """Make GET request to Jellyfin API."""
-        r = self._session.get(f"{self.url}{path}", params=params or {}, timeout=30)
+        """Make GET request to Jellyfin API (cached; callers must not mutate the result)."""
+        params = params or {}
+        key = (path, tuple(sorted(params.items())))
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and now - entry[0] < self.CACHE_TTL:
+                self._cache.move_to_end(key)
+                return entry[1]
+
+        r = self._session.get(f"{self.url}{path}", params=params, timeout=30)
         r.raise_for_status()
-        return r.json()
+        data = orjson.loads(r.content) if orjson is not None else r.json()
+
+        with self._cache_lock:
+            self._cache[key] = (now, data)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_MAX:
+                self._cache.popitem(last=False)
+        return data
 
     def _get_user_id(self) -> str:
         """Get first user ID (admin typically)."""
@@ -58,52 +109,36 @@ class JellyfinClient:
             params["Filters"] = filters
 
         data = self._get("/Items", params)
-        return data.get("Items", [])
+        return list(data.get("Items", []))
 
     def get_items_by_genres(self, genres: list[str]) -> list[dict]:
-        """Fetch items that match any of the given genres (tags)."""
-        all_items: list[dict] = []
-        for genre in genres:
-            params = {
-                "UserId": self._get_user_id(),
-                "Recursive": "true",
-                "IncludeItemTypes": "Movie,Episode",
-                "Genres": genre,
-            }
-            data = self._get("/Items", params)
-            all_items.extend(data.get("Items", []))
-
-        # Deduplicate by Id
-        seen: set[str] = set()
-        unique: list[dict] = []
-        for item in all_items:
-            if item["Id"] not in seen:
-                seen.add(item["Id"])
-                unique.append(item)
-        return unique
+        """Fetch items that match any of the given genres (tags).
+        Genres are sent in one request; Jellyfin ORs pipe-separated values."""
+        if not genres:
+            return []
+        params = {
+            "UserId": self._get_user_id(),
+            "Recursive": "true",
+            "IncludeItemTypes": "Movie,Episode",
+            "Genres": "|".join(genres),
+        }
+        data = self._get("/Items", params)
+        return _dedupe_by_id(data.get("Items", []))
 
     def get_items_by_tags(self, tags: list[str]) -> list[dict]:
-        """Fetch items that have any of the given tags (uses API Tags filter)."""
-        all_items: list[dict] = []
-        for tag in tags:
-            params = {
-                "UserId": self._get_user_id(),
-                "Recursive": "true",
-                "IncludeItemTypes": "Movie,Episode",
-                "Tags": tag,
-                "Fields": "Path,MediaSources,RunTimeTicks,CumulativeRunTimeTicks",
-            }
-            data = self._get("/Items", params)
-            all_items.extend(data.get("Items", []))
-
-        # Deduplicate by Id
-        seen: set[str] = set()
-        unique: list[dict] = []
-        for item in all_items:
-            if item["Id"] not in seen:
-                seen.add(item["Id"])
-                unique.append(item)
-        return unique
+        """Fetch items that have any of the given tags (uses API Tags filter).
+        Tags are sent in one request; Jellyfin ORs pipe-separated values."""
+        if not tags:
+            return []
+        params = {
+            "UserId": self._get_user_id(),
+            "Recursive": "true",
+            "IncludeItemTypes": "Movie,Episode",
+            "Tags": "|".join(tags),
+            "Fields": "Path,MediaSources,RunTimeTicks,CumulativeRunTimeTicks",
+        }
+        data = self._get("/Items", params)
+        return _dedupe_by_id(data.get("Items", []))
 
     def get_items_by_category(self, category: str) -> list[dict]:
         """
@@ -129,6 +164,26 @@ class JellyfinClient:
             return item["MediaSources"][0].get("Path")
         return None
 
+    def get_items_paths(self, item_ids: list[str], chunk_size: int = 200) -> dict[str, str]:
+        """Get file paths for many items, one /Items request per chunk_size ids.
+        Items without a resolvable path are left out of the result."""
+        user_id = self._get_user_id()
+        paths: dict[str, str] = {}
+        for i in range(0, len(item_ids), chunk_size):
+            params = {
+                "UserId": user_id,
+                "Ids": ",".join(item_ids[i:i + chunk_size]),
+                "Fields": "Path,MediaSources",
+            }
+            data = self._get("/Items", params)
+            for item in data.get("Items", []):
+                path = item.get("Path")
+                if not path and item.get("MediaSources"):
+                    path = item["MediaSources"][0].get("Path")
+                if path:
+                    paths[item["Id"]] = path
+        return paths
+
     def get_media_sources(self, item_id: str) -> list[dict]:
         """Get media sources for an item (for episodes, etc.)."""
         user_id = self._get_user_id()
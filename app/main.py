@@ -1,18 +1,19 @@
 """DaphneTV - Jellyfin 24/7 TV Channel System entry point."""
+import io
 import json
 import logging
 import os
 import signal
 import sys
 import threading
-from datetime import date
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 import time
 
-from app.config.loader import get_channel_config, load_config
+from app.config.loader import get_channel_config, load_config, resolve_config_path
 from app.epg.xmltv import generate_xmltv
-from app.http.m3u import generate_m3u
+from app.http.m3u import generate_m3u_bytes
 from app.http.server import run_http_server
 from app.jellyfin.client import JellyfinClient
 from app.scheduler.generator import ChannelScheduler
@@ -30,6 +31,14 @@ _ffmpeg_managers: list[FFmpegManager] = []
 _channel_ids: list[str] = []
 _http_server = None
 _schedule_thread: threading.Thread | None = None
+# Shared Jellyfin client and the (url, api_key) it was built from
+_JELLYFIN: JellyfinClient | None = None
+_JELLYFIN_KEY: tuple[str | None, str | None] | None = None
+
+# Rendered M3U: ((config path, mtime_ns, base url), content)
+_M3U_CACHE: tuple[tuple[str, int, str], bytes] | None = None
+# Rendered EPG fragments: channel id -> ((schedule path, mtime_ns, channel name), fragment)
+_EPG_CACHE: dict[str, tuple[tuple[str, int, str], bytes]] = {}
 
 
 def _ensure_dirs():
@@ -40,16 +49,21 @@ def _ensure_dirs():
     Path(os.getenv("STREAM_DIR", "/stream")).mkdir(parents=True, exist_ok=True)
 
 
+def _get_jellyfin(config: dict) -> JellyfinClient:
+    """Return the shared Jellyfin client, rebuilding it when url or api_key change."""
+    global _JELLYFIN, _JELLYFIN_KEY
+    key = (config["jellyfin"].get("url"), config["jellyfin"].get("api_key"))
+    if _JELLYFIN is None or _JELLYFIN_KEY != key:
+        _JELLYFIN = JellyfinClient(*key)
+        _JELLYFIN_KEY = key
+    return _JELLYFIN
+
+
 def _run_channel(channel_id: str) -> bool:
     """Generate schedule, playlist, and start FFmpeg for a channel."""
     config = load_config()
     channel_config = get_channel_config(config, channel_id)
-    jellyfin = JellyfinClient(
-        config["jellyfin"].get("url"),
-        config["jellyfin"].get("api_key"),
-    )
-
-    scheduler = ChannelScheduler(config, channel_id, jellyfin)
+    scheduler = ChannelScheduler(config, channel_id, _get_jellyfin(config))
     blocks = scheduler.generate_daily_schedule(date.today())
     if not blocks:
         logger.error("No schedule blocks generated for %s", channel_id)
@@ -76,6 +90,8 @@ def _regenerate_schedules():
     """Regenerate schedules and playlists for current day, restart FFmpeg."""
     logger.info("Running daily schedule regeneration...")
     config = load_config()
+    # Library contents may have changed since yesterday
+    _get_jellyfin(config).clear_cache()
     schedules_dir = Path(os.getenv("CONFIG_DIR", "/config")) / "schedules"
     playlists_dir = Path(os.getenv("CONFIG_DIR", "/config")) / "playlists"
     target_date = date.today()
@@ -83,11 +99,7 @@ def _regenerate_schedules():
     for channel_id in _channel_ids:
         try:
             channel_config = get_channel_config(config, channel_id)
-            jellyfin = JellyfinClient(
-                config["jellyfin"].get("url"),
-                config["jellyfin"].get("api_key"),
-            )
-            scheduler = ChannelScheduler(config, channel_id, jellyfin)
+            scheduler = ChannelScheduler(config, channel_id, _get_jellyfin(config))
             blocks = scheduler.generate_daily_schedule(target_date)
             if blocks:
                 scheduler.save_schedule(blocks, target_date)
@@ -109,42 +121,70 @@ def _regenerate_schedules():
             logger.exception("Failed to regenerate %s: %s", channel_id, e)
 
 
+def _seconds_until_midnight() -> float:
+    """Seconds from now until just after the next local midnight."""
+    now = datetime.now()
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=1, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
 def _schedule_worker():
-    """Check every minute if we've crossed midnight, then regenerate."""
+    """Sleep until just past midnight, then regenerate."""
     last_date = date.today()
     while True:
-        time.sleep(60)
+        time.sleep(_seconds_until_midnight())
         today = date.today()
+        # Guard against early wakeups (e.g. clock adjustments)
         if today != last_date:
             last_date = today
             _regenerate_schedules()
 
 
-def _channels_m3u() -> str:
-    """Generate M3U content for all channels."""
-    config = load_config()
+def _channels_m3u() -> bytes:
+    """Generate encoded M3U content for all channels; reused until config.yaml changes."""
+    global _M3U_CACHE
+    config_path = resolve_config_path()
     base_url = os.getenv("M3U_BASE_URL", "http://localhost:8001")
-    return generate_m3u(config["channels"], base_url)
-
-
-def _epg_xml() -> str:
-    """Generate combined XMLTV EPG for all channels."""
+    key = (str(config_path), config_path.stat().st_mtime_ns, base_url)
+    cached = _M3U_CACHE
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    config = load_config(config_path)
+    content = generate_m3u_bytes(config["channels"], base_url)
+    _M3U_CACHE = (key, content)
+    return content
+
+
+def _epg_xml() -> bytes:
+    """Generate combined, UTF-8 encoded XMLTV EPG for all channels.
+    Per-channel fragments are reused until the schedule file changes."""
     config = load_config()
     schedules_dir = Path(os.getenv("CONFIG_DIR", "/config")) / "schedules"
     today = date.today()
-    parts = ['<?xml version="1.0" encoding="UTF-8"?>', "<tv>"]
+    buf = io.BytesIO()
+    w = buf.write
+    w(b'<?xml version="1.0" encoding="UTF-8"?>\n<tv>\n')
 
     for ch in config["channels"]:
         ch_id = ch["id"]
         ch_name = ch.get("name", ch_id)
         schedule_path = schedules_dir / f"{ch_id}_{today.isoformat()}.json"
-        if schedule_path.exists():
-            with open(schedule_path, encoding="utf-8") as f:
-                sched = json.load(f)
-            fragment = generate_xmltv(sched, ch_id, ch_name, fragment=True)
-            parts.append(fragment)
-    parts.append("</tv>")
-    return "\n".join(parts)
+        try:
+            mtime_ns = schedule_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+        key = (str(schedule_path), mtime_ns, ch_name)
+        cached = _EPG_CACHE.get(ch_id)
+        if cached is not None and cached[0] == key:
+            w(cached[1])
+            continue
+        with open(schedule_path, encoding="utf-8") as f:
+            sched = json.load(f)
+        fragment = generate_xmltv(sched, ch_id, ch_name, fragment=True).encode("utf-8")
+        _EPG_CACHE[ch_id] = (key, fragment)
+        w(fragment)
+    w(b"</tv>")
+    return buf.getvalue()
 
 
 def _health_check() -> bool:
@@ -168,6 +208,7 @@ def main():
 
     _ensure_dirs()
     config = load_config()
+    _get_jellyfin(config)
 
     channel_id = os.getenv("CHANNEL_ID")
     if channel_id:
@@ -192,7 +233,7 @@ def main():
         logger.error("No channels started successfully")
         sys.exit(1)
 
-    # Daily regeneration (checks every minute for date change)
+    # Daily regeneration (sleeps until midnight)
     _schedule_thread = threading.Thread(target=_schedule_worker, daemon=True)
     _schedule_thread.start()
 
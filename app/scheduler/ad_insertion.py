@@ -1,14 +1,54 @@
 """Ad insertion logic for schedule blocks."""
+import bisect
 import logging
 import os
+from functools import lru_cache
+from itertools import accumulate
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+from app.scheduler.block import Block
 
 logger = logging.getLogger(__name__)
 
+# Ad scans: (directory, formats) -> ({walked dir: mtime_ns}, inventory)
+_INV_CACHE: dict[tuple[str, tuple[str, ...]], tuple[dict[str, int], list[dict]]] = {}
+
+
+def _iter_ad_files(
+    directory: str,
+    formats: set[str],
+    dir_mtimes: dict[str, int],
+) -> Iterator[os.DirEntry]:
+    """Recursively yield files under directory whose lowercased extension is in formats.
+    Records the mtime_ns of every directory walked into dir_mtimes."""
+    try:
+        # Stat before listing so a change made mid-scan invalidates the next lookup
+        dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError as e:
+        logger.warning("Could not scan %s: %s", directory, e)
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_ad_files(entry.path, formats, dir_mtimes)
+        elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in formats:
+            yield entry
+
+
+def _dirs_unchanged(dir_mtimes: dict[str, int]) -> bool:
+    """True if every recorded directory still exists with the same mtime_ns."""
+    try:
+        return all(os.stat(d).st_mtime_ns == m for d, m in dir_mtimes.items())
+    except OSError:
+        return False
+
 
 def get_ad_inventory(ads_config: dict[str, Any]) -> list[dict]:
-    """Scan ads directory and build inventory of ad files."""
+    """Scan ads directory and build inventory of ad files.
+    Scans are cached per (directory, formats) and reused while none of the walked
+    directories' mtimes change; checking costs one stat per directory, not per file."""
     ad_dir = Path(ads_config.get("directory", "/ads"))
     formats = ads_config.get("formats", [".mp4", ".mkv"])
     inventory: list[dict] = []
@@ -17,16 +57,24 @@ def get_ad_inventory(ads_config: dict[str, Any]) -> list[dict]:
         logger.warning("Ads directory does not exist: %s", ad_dir)
         return inventory
 
-    for ext in formats:
-        for f in ad_dir.rglob(f"*{ext}"):
-            if f.is_file():
-                inventory.append({
-                    "title": f.stem,
-                    "file_path": str(f.resolve()),
-                })
-
+    key = (str(ad_dir), tuple(formats))
+    cached = _INV_CACHE.get(key)
+    if cached is not None and _dirs_unchanged(cached[0]):
+        return list(cached[1])
+
+    # Accept formats with or without the leading dot ("mp4" or ".mp4")
+    formats_set = {"." + e.lower().lstrip(".") for e in formats}
+    dir_mtimes: dict[str, int] = {}
+    for entry in _iter_ad_files(os.path.abspath(ad_dir), formats_set, dir_mtimes):
+        stem, _ = os.path.splitext(entry.name)
+        inventory.append({
+            "title": stem,
+            "file_path": entry.path,
+        })
+
+    _INV_CACHE[key] = (dir_mtimes, inventory)
     logger.info("Found %d ads in %s", len(inventory), ad_dir)
-    return inventory
+    return list(inventory)
 
 
 def _round_robin_ads(
@@ -35,21 +83,47 @@ def _round_robin_ads(
     start_index: int = 0,
 ) -> list[dict]:
     """Select ads using round-robin from start_index."""
-    if not inventory:
+    n = len(inventory)
+    if not n or count <= 0:
         return []
-    selected: list[dict] = []
-    for i in range(count):
-        selected.append(inventory[(start_index + i) % len(inventory)])
-    return selected
+    s = start_index % n
+    end = s + count
+    if end <= n:
+        return inventory[s:end]
+    # Wraps around: tile enough copies to cover the window
+    return (inventory * (end // n + 1))[s:end]
+
+
+_AD_SELECTORS = {
+    "round-robin": _round_robin_ads,
+}
+
+
+def _compute_breaks(
+    show_seconds: list[int],
+    freqs: list[int],
+    break_at_start: bool = True,
+) -> list[int]:
+    """
+    Number of ad breaks before each show: the frequency boundaries (seconds) crossed
+    between the running total before the show and after it. With break_at_start=False,
+    shows starting at a running total of 0 get none.
+    """
+    return [
+        end // freq - start // freq if start or break_at_start else 0
+        for start, end, freq in zip(
+            accumulate(show_seconds, initial=0), accumulate(show_seconds), freqs
+        )
+    ]
 
 
 def insert_ads(
-    blocks: list[dict],
+    blocks: list[Block],
     ad_frequency: int,
     ads_config: dict[str, Any],
     ad_rotation: dict[str, Any],
     ads_per_break: int | None = None,
-) -> list[dict]:
+) -> list[Block]:
     """
     Insert ad blocks into schedule based on frequency (seconds).
     Returns new list of blocks with ad_block entries inserted.
@@ -61,51 +135,42 @@ def insert_ads(
 
     ads_per_break = ads_per_break or ad_rotation.get("ads_per_break", 2)
     strategy = ad_rotation.get("strategy", "round-robin")
+    # Resolve the selector once; weighted/random default to round-robin for now
+    select_ads = _AD_SELECTORS.get(strategy, _round_robin_ads)
 
-    result: list[dict] = []
-    cumulative_seconds = 0
+    result: list[Block] = []
     ad_index = 0
 
+    show_seconds = [block.run_minutes * 60 for block in blocks if block.type == "show"]
+    # No break before the first show
+    breaks = iter(_compute_breaks(
+        show_seconds, [ad_frequency] * len(show_seconds), break_at_start=False
+    ))
+
     for block in blocks:
-        if block["type"] == "show":
-            run_minutes = block.get("run_minutes", 30)
-            block_seconds = run_minutes * 60
-
-            # Check if we need an ad break before this block
-            while cumulative_seconds > 0 and (cumulative_seconds // ad_frequency) < (
-                (cumulative_seconds + block_seconds) // ad_frequency
-            ):
+        if block.type == "show":
+            for _ in range(next(breaks)):
                 # Insert ad break
-                if strategy == "round-robin":
-                    ad_items = _round_robin_ads(inventory, ads_per_break, ad_index)
-                else:
-                    # Default to round-robin for weighted/random for now
-                    ad_items = _round_robin_ads(inventory, ads_per_break, ad_index)
+                ad_items = select_ads(inventory, ads_per_break, ad_index)
                 ad_index += ads_per_break
 
                 if ad_items:
-                    result.append({
-                        "start_time": "",
-                        "end_time": "",
-                        "type": "ad_block",
-                        "ads": ad_items,
-                    })
+                    result.append(Block.ad_break(ad_items))
 
             result.append(block)
-            cumulative_seconds += block_seconds
 
-        elif block["type"] == "ad_block":
+        elif block.type == "ad_block":
             result.append(block)
 
     return result
 
 
 def insert_ads_simple(
-    blocks: list[dict],
+    blocks: list[Block],
     schedule_config: list[dict],
     ads_config: dict[str, Any],
     ad_rotation: dict[str, Any],
-) -> list[dict]:
+) -> list[Block]:
     """
     Insert ads based on per-block ad_frequency from schedule config.
     Groups blocks by their schedule slot and applies that slot's ad_frequency.
@@ -115,57 +180,64 @@ def insert_ads_simple(
         return blocks
 
     ads_per_break = ad_rotation.get("ads_per_break", 2)
-    result: list[dict] = []
+    result: list[Block] = []
     ad_index = 0
 
     # Build map of time range -> ad_frequency
     slot_freq: dict[tuple[int, int], int] = {}
     for slot in schedule_config:
-        start, end = _parse_time_range_minutes(slot["time"])
+        start, end = slot.get("_range") or _parse_time_range_minutes(slot["time"])
         slot_freq[(start, end)] = slot.get("ad_frequency", 900)
 
-    def get_ad_frequency_for_block(block: dict) -> int:
-        start_time = block.get("start_time", "00:00:00")
-        parts = start_time.split(":")
-        mins = int(parts[0]) * 60 + int(parts[1]) if len(parts) >= 2 else 0
-        for (s, e), freq in slot_freq.items():
-            if s <= mins < e:
-                return freq
-        return 900
-
-    cumulative_seconds = 0
-    current_freq = 900
+    # Slots don't overlap, so sorted starts allow a bisect lookup
+    slots = sorted(slot_freq.items())
+    slot_starts = [s for (s, _), _ in slots]
+    slot_ends = [e for (_, e), _ in slots]
+    slot_freqs = [freq for _, freq in slots]
+
+    freq_cache: dict[str, int] = {}
+
+    def get_ad_frequency_for_block(block: Block) -> int:
+        start_time = block.start_time
+        key = start_time[:5]
+        cached = freq_cache.get(key)
+        if cached is not None:
+            return cached
+        if len(start_time) >= 5 and start_time[2] == ":":
+            # Generator always writes zero-padded HH:MM:00
+            mins = int(start_time[0:2]) * 60 + int(start_time[3:5])
+        else:
+            parts = start_time.split(":")
+            mins = int(parts[0]) * 60 + int(parts[1]) if len(parts) >= 2 else 0
+        idx = bisect.bisect_right(slot_starts, mins) - 1
+        freq = slot_freqs[idx] if idx >= 0 and mins < slot_ends[idx] else 900
+        freq_cache[key] = freq
+        return freq
+
+    shows = [block for block in blocks if block.type == "show"]
+    breaks = iter(_compute_breaks(
+        [block.run_minutes * 60 for block in shows],
+        [get_ad_frequency_for_block(block) for block in shows],
+    ))
 
     for block in blocks:
-        if block["type"] == "show":
-            current_freq = get_ad_frequency_for_block(block)
-            run_minutes = block.get("run_minutes", 30)
-            block_seconds = run_minutes * 60
-
+        if block.type == "show":
             # Insert ad break if we've passed a boundary
-            prev_breaks = cumulative_seconds // current_freq
-            new_breaks = (cumulative_seconds + block_seconds) // current_freq
-            for _ in range(new_breaks - prev_breaks):
+            for _ in range(next(breaks)):
                 ad_items = _round_robin_ads(inventory, ads_per_break, ad_index)
                 ad_index += ads_per_break
                 if ad_items:
-                    result.append({
-                        "start_time": "",
-                        "end_time": "",
-                        "type": "ad_block",
-                        "ads": ad_items,
-                    })
-
-            result.append(block)
-            cumulative_seconds += block_seconds
-        else:
-            result.append(block)
+                    result.append(Block.ad_break(ad_items))
+        result.append(block)
 
     return result
 
 
+@lru_cache(maxsize=256)
 def _parse_time_range_minutes(s: str) -> tuple[int, int]:
     """Parse 'HH:MM-HH:MM' into (start_minutes, end_minutes)."""
+    if len(s) == 11 and s[2] == ":" and s[5] == "-" and s[8] == ":":
+        return int(s[0:2]) * 60 + int(s[3:5]), int(s[6:8]) * 60 + int(s[9:11])
     parts = s.strip().split("-")
     if len(parts) != 2:
         return 0, 24 * 60
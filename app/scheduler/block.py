@@ -0,0 +1,43 @@
+"""Schedule block record shared by the generator, ad insertion, and playlist writer."""
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True)
+class Block:
+    """One schedule entry: a show from Jellyfin, or an ad break carrying its ads."""
+
+    start_time: str
+    end_time: str
+    type: str
+    title: str = ""
+    jellyfin_id: str = ""
+    category: str = ""
+    file_path: str | None = None
+    run_minutes: int = 0
+    ads: list[dict] | None = None
+
+    @classmethod
+    def ad_break(cls, ads: list[dict]) -> "Block":
+        """Untimed ad_block holding the given ads."""
+        return cls(start_time="", end_time="", type="ad_block", ads=ads)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Schedule JSON form: shows carry media fields, ad blocks carry their ads."""
+        if self.type == "ad_block":
+            return {
+                "start_time": self.start_time,
+                "end_time": self.end_time,
+                "type": self.type,
+                "ads": self.ads or [],
+            }
+        return {
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "type": self.type,
+            "title": self.title,
+            "jellyfin_id": self.jellyfin_id,
+            "category": self.category,
+            "file_path": self.file_path,
+            "run_minutes": self.run_minutes,
+        }
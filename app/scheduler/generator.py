@@ -4,21 +4,48 @@ import logging
 import os
 import random
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # optional; falls back to stdlib json
+    orjson = None
+
 from app.config.loader import get_channel_config, load_config, parse_time_range, time_to_minutes
 from app.jellyfin.client import JellyfinClient
+from app.scheduler.block import Block
 
 logger = logging.getLogger(__name__)
 
+_TICKS_PER_MINUTE = 10000 * 1000 * 60
+# "HH:MM:00" for every minute of the day, including 24:00:00
+_HHMM00 = tuple(f"{i // 60:02d}:{i % 60:02d}:00" for i in range(24 * 60 + 1))
+
 
+@lru_cache(maxsize=256)
 def _parse_time_range_minutes(s: str) -> tuple[int, int]:
     """Parse 'HH:MM-HH:MM' into (start_minutes, end_minutes) since midnight."""
     start, end = parse_time_range(s)
     return time_to_minutes(start), time_to_minutes(end)
 
 
+def _item_entry(item: dict) -> tuple[int, str | None, str, str]:
+    """Return (run_minutes, file_path, title, id) for a Jellyfin item."""
+    # Jellyfin uses ticks: 10000 ticks = 1ms; missing or sub-minute runtimes count as 30
+    run_ticks = item.get("RunTimeTicks") or item.get("CumulativeRunTimeTicks") or 0
+    run_minutes = int(run_ticks // _TICKS_PER_MINUTE) if run_ticks else 30
+    if run_minutes <= 0:
+        run_minutes = 30
+
+    # Use Path from item if already in API response (avoids extra call)
+    path = item.get("Path")
+    if not path and item.get("MediaSources"):
+        path = item["MediaSources"][0].get("Path")
+    return run_minutes, path, item.get("Name", "Unknown"), item["Id"]
+
+
 class ChannelScheduler:
     """Generates daily programming schedules from config and Jellyfin content."""
 
@@ -36,14 +63,18 @@ class ChannelScheduler:
             config["jellyfin"].get("api_key"),
         )
 
-    def generate_daily_schedule(self, schedule_date: date | None = None) -> list[dict]:
+    def generate_daily_schedule(self, schedule_date: date | None = None) -> list[Block]:
         """Create 24-hour programming block with content from Jellyfin."""
         schedule_date = schedule_date or date.today()
-        blocks: list[dict] = []
+        blocks: list[Block] = []
         schedule_config = self.channel_config["schedule"]
+        # Seeded per channel and day so regenerating a day reproduces its schedule
+        rng = random.Random(f"{self.channel_id}:{schedule_date.isoformat()}")
 
         for block_config in schedule_config:
-            start_min, end_min = _parse_time_range_minutes(block_config["time"])
+            start_min, end_min = block_config.get("_range") or _parse_time_range_minutes(
+                block_config["time"]
+            )
             category = block_config["category"]
             ad_frequency = block_config.get("ad_frequency", 900)
 
@@ -58,59 +89,51 @@ class ChannelScheduler:
                 continue
 
             # Shuffle for variety
-            random.shuffle(items)
+            rng.shuffle(items)
+
+            # Runtime, path, and title depend only on the item; work them out once per
+            # item rather than every time the loop cycles back to it
+            entries = [_item_entry(item) for item in items]
+            n_entries = len(entries)
 
             current_min = start_min
             item_index = 0
 
             while current_min < end_min:
-                item = items[item_index % len(items)]
+                run_minutes, path, title, item_id = entries[item_index % n_entries]
                 item_index += 1
 
-                # Get runtime in minutes (Jellyfin uses ticks: 10000 ticks = 1ms)
-                run_ticks = item.get("RunTimeTicks") or item.get("CumulativeRunTimeTicks") or 0
-                run_minutes = int(run_ticks / (10000 * 1000 * 60)) if run_ticks else 30
-
-                if run_minutes <= 0:
-                    run_minutes = 30
-
                 end_min_this = min(current_min + run_minutes, end_min)
                 actual_run = end_min_this - current_min
 
-                start_time = f"{current_min // 60:02d}:{current_min % 60:02d}:00"
-                end_time = f"{end_min_this // 60:02d}:{end_min_this % 60:02d}:00"
-
-                # Use Path from item if already in API response (avoids extra call)
-                path = item.get("Path")
-                if not path and item.get("MediaSources"):
-                    path = item["MediaSources"][0].get("Path") if item["MediaSources"] else None
-
-                blocks.append({
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "type": "show",
-                    "title": item.get("Name", "Unknown"),
-                    "jellyfin_id": item["Id"],
-                    "category": category,
-                    "file_path": path,
-                    "run_minutes": actual_run,
-                })
+                blocks.append(Block(
+                    start_time=_HHMM00[current_min],
+                    end_time=_HHMM00[end_min_this],
+                    type="show",
+                    title=title,
+                    jellyfin_id=item_id,
+                    category=category,
+                    file_path=path,
+                    run_minutes=actual_run,
+                ))
 
                 current_min = end_min_this
 
         # Resolve file paths for blocks missing them (items may not include Path in list response)
-        for block in blocks:
-            if block["type"] == "show" and block.get("jellyfin_id") and not block.get("file_path"):
-                try:
-                    path = self.jellyfin.get_item_file_path(block["jellyfin_id"])
-                    if path:
-                        block["file_path"] = path
-                    else:
-                        sources = self.jellyfin.get_media_sources(block["jellyfin_id"])
-                        if sources and sources[0].get("Path"):
-                            block["file_path"] = sources[0]["Path"]
-                except Exception as e:
-                    logger.warning("Could not get file path for %s: %s", block["jellyfin_id"], e)
+        missing_ids = list(dict.fromkeys(
+            block.jellyfin_id
+            for block in blocks
+            if block.type == "show" and block.jellyfin_id and not block.file_path
+        ))
+        if missing_ids:
+            try:
+                paths = self.jellyfin.get_items_paths(missing_ids)
+            except Exception as e:
+                logger.warning("Could not get file paths for %d items: %s", len(missing_ids), e)
+                paths = {}
+            for block in blocks:
+                if block.type == "show" and not block.file_path:
+                    block.file_path = paths.get(block.jellyfin_id)
 
         # Insert ads
         from app.scheduler.ad_insertion import insert_ads_simple
@@ -122,7 +145,7 @@ class ChannelScheduler:
         )
         return blocks
 
-    def save_schedule(self, blocks: list[dict], schedule_date: date) -> Path:
+    def save_schedule(self, blocks: list[Block], schedule_date: date) -> Path:
         """Save schedule JSON to config/schedules/."""
         schedules_dir = Path(os.getenv("CONFIG_DIR", "/config")) / "schedules"
         schedules_dir.mkdir(parents=True, exist_ok=True)
@@ -130,9 +153,14 @@ class ChannelScheduler:
         data = {
             "date": schedule_date.isoformat(),
             "channel_id": self.channel_id,
-            "blocks": blocks,
+            "blocks": [block.to_dict() for block in blocks],
         }
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            path.write_bytes(
+                orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+            )
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
         logger.info("Saved schedule to %s", path)
         return path
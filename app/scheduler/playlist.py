@@ -2,65 +2,126 @@
 import logging
 import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+from app.scheduler.block import Block
 
 logger = logging.getLogger(__name__)
 
+# Below this many checked files in one directory, stat them individually
+_SCANDIR_MIN_FILES = 4
 
-def escape_path(path: str) -> str:
-    """Escape path for FFmpeg concat format. Single quotes in path must be escaped."""
-    return path.replace("'", "'\\''")
+
+def _iov_max() -> int:
+    """Max buffers per writev call (POSIX guarantees at least 16)."""
+    try:
+        value = os.sysconf("SC_IOV_MAX")
+    except (AttributeError, OSError, ValueError):
+        return 1024
+    return value if value > 0 else 1024
 
 
-def validate_files_exist(blocks: list[dict]) -> tuple[list[str], list[dict]]:
+_IOV_MAX = _iov_max()
+
+
+def escape_path(path: str) -> str:
+    """Escape path for FFmpeg concat format. Single quotes in path must be escaped."""
+    return path if "'" not in path else path.replace("'", "'\\''")
+
+
+def _existing_paths(paths: list[str]) -> set[str]:
+    """Return the subset of paths that exist.
+    Directories holding several checked files are listed once with os.scandir
+    instead of stat'ing each file; small groups fall back to os.path.exists."""
+    by_dir: dict[str, list[str]] = {}
+    for p in paths:
+        by_dir.setdefault(os.path.dirname(p), []).append(p)
+
+    existing: set[str] = set()
+    for directory, group in by_dir.items():
+        if len(group) >= _SCANDIR_MIN_FILES:
+            try:
+                with os.scandir(directory or ".") as it:
+                    # is_file() follows symlinks, so dangling links count as missing
+                    names = {e.name for e in it if e.is_file()}
+            except OSError:
+                names = None
+            if names is not None:
+                existing.update(p for p in group if os.path.basename(p) in names)
+                continue
+        existing.update(p for p in group if os.path.exists(p))
+    return existing
+
+
+def validate_files_exist(blocks: list[Block]) -> tuple[list[str], list[Block]]:
     """Check all file paths exist. Returns (missing_paths, valid_blocks)."""
     missing: list[str] = []
-    valid: list[dict] = []
+    valid: list[Block] = []
+
+    paths: set[str] = set()
+    for block in blocks:
+        if block.type == "show" and block.file_path:
+            paths.add(block.file_path)
+        elif block.type == "ad_block":
+            paths.update(ad["file_path"] for ad in block.ads or [] if ad.get("file_path"))
+    existing = _existing_paths(list(paths))
 
     for block in blocks:
         block_ok = True
-        if block["type"] == "show" and block.get("file_path"):
-            if not Path(block["file_path"]).exists():
-                missing.append(block["file_path"])
-                logger.warning("Media file not found: %s", block["file_path"])
+        if block.type == "show" and block.file_path:
+            if block.file_path not in existing:
+                missing.append(block.file_path)
+                logger.warning("Media file not found: %s", block.file_path)
                 block_ok = False
-        elif block["type"] == "ad_block":
-            for ad in block.get("ads", []):
+        elif block.type == "ad_block":
+            for ad in block.ads or []:
                 fp = ad.get("file_path")
-                if fp and not Path(fp).exists():
+                if fp and fp not in existing:
                     missing.append(fp)
                     block_ok = False
-        if block_ok or block["type"] != "show":
+        if block_ok or block.type != "show":
             valid.append(block)
 
     return missing, valid
 
 
-def schedule_to_concat_playlist(blocks: list[dict]) -> str:
-    """Convert schedule blocks to FFmpeg concat format."""
-    lines: list[str] = []
+def _writev_all(fd: int, chunks: list[bytes]) -> None:
+    """Write all chunks to fd with os.writev, in batches of at most IOV_MAX buffers."""
+    for i in range(0, len(chunks), _IOV_MAX):
+        batch = chunks[i:i + _IOV_MAX]
+        written = os.writev(fd, batch)
+        total = sum(map(len, batch))
+        if written < total:
+            # Short write: finish the rest of this batch with plain writes
+            rest = memoryview(b"".join(batch))[written:]
+            while rest:
+                rest = rest[os.write(fd, rest):]
+
 
+def iter_concat_lines(blocks: list[Block]) -> Iterator[str]:
+    """Yield FFmpeg concat lines ("file '...'\\n") for schedule blocks in order."""
     for block in blocks:
-        if block["type"] == "show" and block.get("file_path"):
-            path = escape_path(block["file_path"])
-            lines.append(f"file '{path}'")
-        elif block["type"] == "ad_block":
-            for ad in block.get("ads", []):
+        if block.type == "show" and block.file_path:
+            yield f"file '{escape_path(block.file_path)}'\n"
+        elif block.type == "ad_block":
+            for ad in block.ads or []:
                 fp = ad.get("file_path")
                 if fp:
-                    path = escape_path(fp)
-                    lines.append(f"file '{path}'")
+                    yield f"file '{escape_path(fp)}'\n"
 
-    return "\n".join(lines) + "\n"
+
+def schedule_to_concat_playlist(blocks: list[Block]) -> str:
+    """Convert schedule blocks to FFmpeg concat format."""
+    return "".join(iter_concat_lines(blocks))
 
 
 def write_playlist(
-    blocks: list[dict],
+    blocks: list[Block],
     channel_id: str,
     output_dir: str | Path | None = None,
     validate: bool = True,
 ) -> Path:
-    """Generate concat playlist and write to file."""
+    """Generate concat playlist and write it to file (one writev per IOV_MAX lines)."""
     if validate:
         missing, blocks = validate_files_exist(blocks)
         if missing:
@@ -70,9 +131,16 @@ def write_playlist(
     output_dir.mkdir(parents=True, exist_ok=True)
     path = output_dir / f"{channel_id}.txt"
 
-    content = schedule_to_concat_playlist(blocks)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
-
-    logger.info("Wrote playlist to %s (%d lines)", path, len(content.strip().splitlines()))
+    chunks = [line.encode("utf-8") for line in iter_concat_lines(blocks)]
+    if hasattr(os, "writev"):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            _writev_all(fd, chunks)
+        finally:
+            os.close(fd)
+    else:
+        with open(path, "wb", buffering=1 << 16) as f:
+            f.writelines(chunks)
+
+    logger.info("Wrote playlist to %s (%d lines)", path, len(chunks))
     return path
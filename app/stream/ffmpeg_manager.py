@@ -1,6 +1,7 @@
 """FFmpeg process management for HLS streaming."""
 import logging
 import os
+import re
 import subprocess
 import threading
 from pathlib import Path
@@ -8,6 +9,8 @@ from typing import Callable, Optional
 
 logger = logging.getLogger(__name__)
 
+_ERR_RE = re.compile(r"error", re.IGNORECASE).search
+
 
 class FFmpegManager:
     """Manages FFmpeg subprocess for HLS streaming."""
@@ -61,9 +64,11 @@ class FFmpegManager:
         try:
             self._process = subprocess.Popen(
                 cmd,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
                 text=True,
+                errors="replace",
+                bufsize=1,
             )
             self._running = True
             self._monitor_thread = threading.Thread(target=self._monitor_process, daemon=True)
@@ -78,15 +83,15 @@ class FFmpegManager:
             return False
 
     def _monitor_process(self) -> None:
-        """Monitor process and read stderr."""
-        if not self._process:
+        """Monitor process, logging error lines from stderr as they arrive."""
+        proc = self._process
+        if not proc:
             return
         try:
-            _, stderr = self._process.communicate()
-            if stderr:
-                for line in stderr.splitlines():
-                    if "error" in line.lower() or "Error" in line:
-                        logger.error("[FFmpeg %s] %s", self.channel_id, line)
+            for line in proc.stderr:
+                if _ERR_RE(line):
+                    logger.error("[FFmpeg %s] %s", self.channel_id, line.rstrip())
+            proc.wait()
         except Exception as e:
             logger.warning("Monitor error: %s", e)
         finally: